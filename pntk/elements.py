@@ -1,4 +1,8 @@
-import uuid
+import itertools
+from types import MappingProxyType
+
+# ids of places, transitions and arcs, unique within the process
+_id_counter = itertools.count()
 
 class Layout():
     def __init__(self, x=0, y=0, width=50, height=50, stroke_thick=1):
@@ -11,33 +15,64 @@ class Layout():
 
 class Place():
     def __init__(self, name, initial_marking, port_type=''):
-        self.id = uuid.uuid4()
+        self.id = next(_id_counter)
+        self.kind = 'P'
         self.name = name
         self.ins = dict()
         self.outs = dict()
         self.in_arcs = dict()
         self.out_arcs = dict()
-        self.marking = initial_marking
+        self.net = None           # owning net, set when added to a ColoredPetriNet
+        self.row = None           # row of the place in net.M
+        self.mark_kinds = set()   # mark kinds held by the place once in a net
+        self._marking = initial_marking
         self.initial_marking = dict()
         self.processing_time = 0.0
         self.time = 0.0
         for key in initial_marking.keys():
             self.initial_marking[key] = initial_marking[key]
         
+    @property
+    def marking(self):
+        """
+        Once the place is added to a net, the marking is a read-only snapshot of its row in the net's
+        marking matrix, holding the mark kinds of the place and any other kind it has tokens of.
+        Use set_mark / add_mark to change it.
+
+        Returns:
+            dict: kvp of mark kind: number
+        """
+        if self.net is None:
+            return self._marking
+        row = self.net.M[self.row]
+        return MappingProxyType({key: int(row[col]) for key, col in self.net.color_index.items()
+                                 if key in self.mark_kinds or row[col]})
+
+    @marking.setter
+    def marking(self, new_mark):
+        self.set_mark(new_mark)
+
     @property
     def tokens(self):
         """
         Returns:
             int: The sum of number of tokens in the place
         """
-        return sum(self.marking.values())
+        if self.net is None:
+            return sum(self._marking.values())
+        return int(self.net.M[self.row].sum())
 
     def initialize(self):
         """
         Set the marking to initial marking
         """
-        for key in self.initial_marking.keys():
-            self.marking[key] = self.initial_marking[key]
+        if self.net is None:
+            for key in self.initial_marking.keys():
+                self._marking[key] = self.initial_marking[key]
+        else:
+            self.mark_kinds |= self.initial_marking.keys()
+            self.net.M[self.row] = self.net.M0[self.row]
+            self.net.update_ready_transition([self.id])
             
     def set_mark(self, new_mark):
         """
@@ -46,9 +81,15 @@ class Place():
         Args:
             new_mark (dict): kvp of mark kind: number
         """
-        self.marking = dict()
-        for key in new_mark.keys():
-            self.marking[key] = new_mark[key]
+        if self.net is None:
+            self._marking = dict()
+            for key in new_mark.keys():
+                self._marking[key] = new_mark[key]
+        else:
+            vec = self.net.marking_to_vector(new_mark)
+            self.mark_kinds = set(new_mark.keys())
+            self.net.M[self.row] = vec
+            self.net.update_ready_transition([self.id])
     
     def add_mark(self, new_mark):
         """
@@ -57,17 +98,23 @@ class Place():
         Args:
             new_mark (dict): kvp of mark kind: number
         """
-        for key in new_mark.keys():
-            if key in self.marking.keys():
-                self.marking[key] += new_mark[key]
-            else:
-                self.marking[key] = new_mark[key]
+        if self.net is None:
+            for key, num in new_mark.items():
+                self._marking[key] = self._marking.get(key, 0) + num
+        else:
+            vec = self.net.marking_to_vector(new_mark)
+            self.mark_kinds |= new_mark.keys()
+            self.net.M[self.row] += vec
+            self.net.update_ready_transition([self.id])
                 
     def add_one_mark(self, mark_kind):
-        if mark_kind in self.marking.keys():
-            self.marking[mark_kind] += 1
+        if self.net is None:
+            self._marking[mark_kind] = self._marking.get(mark_kind, 0) + 1
         else:
-            self.marking[mark_kind] = 1
+            col = self.net.add_color(mark_kind)
+            self.mark_kinds.add(mark_kind)
+            self.net.M[self.row, col] += 1
+            self.net.update_ready_transition([self.id])
     
     def set_processing_time(self, processing_time):
         self.processing_time = processing_time
@@ -75,7 +122,8 @@ class Place():
     
 class Transition():
     def __init__(self, name, condition=None, time=0.0, priority=0):
-        self.id = uuid.uuid4()
+        self.id = next(_id_counter)
+        self.kind = 'T'
         self.name = name
         self.ins = dict()
         self.outs = dict()
@@ -83,10 +131,69 @@ class Transition():
         self.out_arcs = dict()
         self.condition = condition
         self.status = 'unready'
-        self.work_status = 'unfiring'
-        self.consumption = time
-        self.time = 0.0           # rest_time
+        self.net = None           # owning net, set when added to a ColoredPetriNet
+        self.col = None           # column of the transition in the net's timer arrays
+        self._work_status = 'unfiring'
+        self._consumption = time
+        self._time = 0.0          # rest_time
         self.priority = priority
+
+    @property
+    def work_status(self):
+        """
+        Once the transition is added to a net, the status is read from net.firing_mask.
+
+        Returns:
+            str: 'firing' or 'unfiring'
+        """
+        if self.net is None:
+            return self._work_status
+        return 'firing' if self.net.firing_mask[self.col] else 'unfiring'
+
+    @work_status.setter
+    def work_status(self, work_status):
+        if self.net is None:
+            self._work_status = work_status
+        else:
+            self.net.set_transition_firing(self, work_status == 'firing')
+
+    @property
+    def time(self):
+        """
+        Once the transition is added to a net, the rest time is read from net.firing_times.
+
+        Returns:
+            float: The rest time of the firing.
+        """
+        if self.net is None:
+            return self._time
+        return float(self.net.firing_times[self.col])
+
+    @time.setter
+    def time(self, time):
+        if self.net is None:
+            self._time = time
+        else:
+            self.net.firing_times[self.col] = time
+
+    @property
+    def consumption(self):
+        """
+        Once the transition is added to a net, the time consumption is read from net.consumption_times.
+
+        Returns:
+            float: The time a firing takes.
+        """
+        if self.net is None:
+            return self._consumption
+        return float(self.net.consumption_times[self.col])
+
+    @consumption.setter
+    def consumption(self, consumption):
+        if self.net is None:
+            self._consumption = consumption
+        else:
+            self.net.consumption_times[self.col] = consumption
         
     # The action of taking a marking from a source place occupies a marking resource
     def tick(self, dt=0.01):
@@ -111,8 +218,9 @@ class Transition():
         
     
 class Arc():
-    def __init__(self, node1, node2, annotation={'0':1}):
-        self.id = uuid.uuid4()
+    def __init__(self, node1, node2, annotation=None):
+        self.id = next(_id_counter)
+        self.kind = 'A'
         if isinstance(node1, Place) and isinstance(node2, Transition):
             self.direction = 'PtoT'
         elif isinstance(node2, Place) and isinstance(node1, Transition):
@@ -123,4 +231,8 @@ class Arc():
         self.node_in = node1
         self.node_out = node2
         self.name = f'{node1.name}->{node2.name}'
-        self.annotation = annotation
\ No newline at end of file
+        self.annotation = {'0':1} if annotation is None else annotation
+        self.ann_vec = None       # annotation aligned to net.color_index, set by ColoredPetriNet.add_arc
+        self.in_row = None        # row of the input place in net.M, set by ColoredPetriNet.add_arc
+        self.out_row = None       # row of the output place in net.M, set by ColoredPetriNet.add_arc
+        self.t_col = None         # column of the transition, set by ColoredPetriNet.add_arc
\ No newline at end of file
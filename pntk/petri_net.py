@@ -3,6 +3,74 @@ import numpy as np
 import uuid
 import csv
 import ast
+import json
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+def _tick_kernel(M, F_out, firing_times, firing_mask, firing_cols, dt):
+    """
+    Tick the firing transitions by dt and put the output tokens of the finished ones into M.
+    All arrays are updated in place. Compiled with numba when it is installed.
+
+    Args:
+        M (np.ndarray): marking matrix, places x colors
+        F_out (np.ndarray): TtoP arc weights, places x transitions x colors
+        firing_times (np.ndarray): rest time of each transition
+        firing_mask (np.ndarray): if each transition is firing
+        firing_cols (np.ndarray): columns of the firing transitions
+        dt (float): delta time
+
+    Returns:
+        np.ndarray: The columns of the finished transitions.
+    """
+    n_places, n_colors = M.shape
+    finished = np.empty(len(firing_cols), dtype=np.int64)
+    n_finished = 0
+    for t in firing_cols:
+        firing_times[t] -= dt
+        if firing_times[t] <= 0.0:
+            firing_times[t] = 0.0
+            firing_mask[t] = False
+            finished[n_finished] = t
+            n_finished += 1
+            for p in range(n_places):
+                for c in range(n_colors):
+                    M[p, c] += F_out[p, t, c]
+    return finished[:n_finished]
+
+
+if numba is not None:
+    _tick_kernel = numba.njit(cache=True, fastmath=False)(_tick_kernel)
+
+
+def _reject_json_constant(name):
+    raise ValueError(f"{name} is not a python literal")
+
+
+def _parse_literal(text):
+    """
+    Parse a python literal from a csv field.
+    Fields only hold strings, numbers, lists and dicts, so the C json parser is tried first.
+    Swapping quotes is only safe when the text holds no double quote and no escape.
+    NaN / Infinity are left to ast.literal_eval, which rejects them.
+
+    Args:
+        text (str): The literal, quoted with single quotes.
+
+    Returns:
+        The parsed value.
+    """
+    if '"' not in text and '\\' not in text:
+        try:
+            return json.loads(text.replace("'", '"'), parse_constant=_reject_json_constant)
+        except ValueError:
+            pass
+    return ast.literal_eval(text)
+
 
 class ColoredPetriNet():
     def __init__(self, name):
@@ -15,51 +83,151 @@ class ColoredPetriNet():
         self.name_node = dict()
         self.id_name = dict()
         self.debug = False
+        self._add_dispatch = {'P': self._add_place, 'T': self._add_transition}
         self.marking_types = list()
+        self.color_index = dict()       # mark kind -> column of M
+        self.place_row = dict()         # place id -> row of M
+        self.transition_col = dict()    # transition id -> column of F_in / F_out
+        self.place_to_transitions = dict()  # place id -> ids of transitions it feeds
+        self._ready = set()             # ids of ready transitions
+        self._firing = set()            # columns of firing transitions
+        self.M = np.zeros((0, 0), dtype=np.int64)     # marking matrix, places x colors
+        self.M0 = np.zeros((0, 0), dtype=np.int64)    # initial marking matrix
+        self._single_color = False      # if the net has exactly one mark kind
+        self.M_scalar = None            # view of the only column of M in a single-color net
+        self._scalar_arcs = None        # per transition (in rows, in weights, out rows, out weights), built lazily
+                                        # and updated per transition until a mark kind is added
+        self._F_in_buf = np.zeros((0, 0, 0), dtype=np.int64)    # storage of F_in, grown geometrically
+        self._F_out_buf = np.zeros((0, 0, 0), dtype=np.int64)   # storage of F_out, grown geometrically
+        self.F_in = self._F_in_buf      # PtoT arc weights, places x transitions x colors
+        self.F_out = self._F_out_buf    # TtoP arc weights, places x transitions x colors
+        self.transition_by_col = list()                  # column -> transition
+        self.firing_times = np.zeros(0)                  # rest time of each transition
+        self.firing_mask = np.zeros(0, dtype=bool)       # if each transition is firing
+        self.consumption_times = np.zeros(0)             # time consumption of each transition
+        self._place_state_buf = np.zeros((0, 0))                   # reused by get_place_state
+        self._trans_state_buf = np.zeros(0)                        # reused by get_transition_state
         self.update_ready_transition()
         
     def __str__(self):
         res = []
         for p in self.places.values():
-            res.append({p.name: p.marking})
+            res.append({p.name: dict(p.marking)})
         return str(res)
         
         
     def add_node(self, node):
         """
         Add node to the petri net.
-        Then update the ready transition list.
+        A new transition is checked for readiness; a new place has no arcs yet.
         Args:
             node (Transition): The transition to be added.
             node (Place): The place to be added.
         Returns:
             None
         """
-        if isinstance(node, Place):
-            self.places[node.id] = node
-            self.name_node[node.name] = node
-            self.id_name[node.id] = node.name
-        elif isinstance(node, Transition):
-            self.transitions[node.id] = node
-            self.name_node[node.name] = node
-            self.id_name[node.id] = node.name
-        else:
+        add = self._add_dispatch.get(getattr(node, 'kind', None))
+        if add is None:
             if self.debug:
                 print("Node adding failed")
-        self.update_ready_transition()
+            return
+        add(node)
+
+    def _add_place(self, node:Place):
+        """
+        Register a place in the net. Append its row to the marking and incidence matrices.
+        A place already in this net is left as is; a place of another net is refused.
+        """
+        if node.id in self.places:
+            return
+        if node.net is not None:
+            if self.debug:
+                print("Node adding failed: place belongs to another net")
+            return
+        for color in (*node.initial_marking, *node.marking):
+            self.add_color(color)
+        initial_vec = self.marking_to_vector(node.initial_marking)
+        vec = self.marking_to_vector(node.marking)
+        node.row = self.M.shape[0]
+        node.mark_kinds = set(node.initial_marking) | set(node.marking)
+        node.net = self
+        self.M = np.vstack([self.M, vec])
+        self.M0 = np.vstack([self.M0, initial_vec])
+        self.M_scalar = self.M[:, 0] if self._single_color else None
+        self.resize_incidence()
+        self.place_row[node.id] = node.row
+        self.place_to_transitions[node.id] = set()
+        self.places[node.id] = node
+        self.name_node[node.name] = node
+        self.id_name[node.id] = node.name
+
+    def _add_transition(self, node:Transition):
+        """
+        Register a transition in the net. Append its column to the timer and incidence arrays.
+        A transition already in this net is left as is; a transition of another net is refused.
+        """
+        if node.id in self.transitions:
+            return
+        if node.net is not None:
+            if self.debug:
+                print("Node adding failed: transition belongs to another net")
+            return
+        self.firing_times = np.append(self.firing_times, node.time)
+        self.firing_mask = np.append(self.firing_mask, node.work_status == 'firing')
+        self.consumption_times = np.append(self.consumption_times, node.consumption)
+        node.col = len(self.transition_by_col)
+        node.net = self
+        self.transition_col[node.id] = node.col
+        self.transition_by_col.append(node)
+        if self.firing_mask[node.col]:
+            self._firing.add(node.col)
+        self.resize_incidence()
+        if self._scalar_arcs is not None:
+            self._scalar_arcs.append(self._scalar_arc_entry(node.col))
+        self.transitions[node.id] = node
+        self.name_node[node.name] = node
+        self.id_name[node.id] = node.name
+        self.transition_ready_check(node)
     
-    def add_arc(self, node1, node2):
+    def add_arc(self, node1, node2, annotation=None):
         """
         Add an arc to the petri net. Link TtoP or PtoT.
-        Then update the ready transition list.
+        Both nodes must already be in the net; otherwise nothing is added.
+        The annotation of the arc is accumulated into the incidence matrices.
+        Then update the ready status of the transition it feeds.
 
         Args:
             node1 (Transition / Place)
             node2 (Place / Transition)
+            annotation (dict): kvp of mark kind: number carried by the arc. {'0': 1} if None.
         Returns:
             None 
         """
-        arc = Arc(node1, node2)
+        node_kinds = (getattr(node1, 'kind', None), getattr(node2, 'kind', None))
+        if node_kinds == ('P', 'T'):
+            linked = node1.id in self.places and node2.id in self.transitions
+        elif node_kinds == ('T', 'P'):
+            linked = node1.id in self.transitions and node2.id in self.places
+        else:
+            linked = False
+        if not linked:
+            if self.debug:
+                print(f"Arc adding failed: both nodes must be a place and a transition of the net")
+            return
+        arc = Arc(node1, node2, annotation)
+        arc.ann_vec = self.marking_to_vector(arc.annotation)
+        arc.ann_vec.flags.writeable = False
+        if arc.direction == 'PtoT':
+            arc.in_row = node1.row
+            arc.t_col = node2.col
+            self.F_in[arc.in_row, arc.t_col] += arc.ann_vec
+            self.place_to_transitions[node1.id].add(node2.id)
+        elif arc.direction == 'TtoP':
+            arc.out_row = node2.row
+            arc.t_col = node1.col
+            self.F_out[arc.out_row, arc.t_col] += arc.ann_vec
+        if self._scalar_arcs is not None:
+            self._scalar_arcs[arc.t_col] = self._scalar_arc_entry(arc.t_col)
         self.arcs[arc.id] = arc
         node1.outs[node2.id] = node2
         node1.out_arcs[arc.id] = arc
@@ -68,7 +236,68 @@ class ColoredPetriNet():
         self.name_node[arc.name] = arc
         self.id_name[arc.id] = arc.name
         self.adj[(node1.id, node2.id)] = arc
-        self.update_ready_transition()
+        if arc.direction == 'PtoT':
+            self.transition_ready_check(node2)
+
+    def add_color(self, color):
+        """
+        Add a new mark kind to the net as a new column of the marking matrix.
+
+        Args:
+            color (str): The mark kind to be added.
+        Returns:
+            int: The column of the mark kind.
+        """
+        col = self.color_index.get(color)
+        if col is not None:
+            return col
+        self.color_index[color] = len(self.color_index)
+        self.marking_types.append(color)
+        self.M = np.pad(self.M, ((0, 0), (0, 1)))
+        self.M0 = np.pad(self.M0, ((0, 0), (0, 1)))
+        self.resize_incidence()
+        for arc in self.arcs.values():
+            arc.ann_vec = np.pad(arc.ann_vec, (0, 1))
+            arc.ann_vec.flags.writeable = False
+        self._single_color = len(self.marking_types) == 1
+        self.M_scalar = self.M[:, 0] if self._single_color else None
+        self._scalar_arcs = None
+        return self.color_index[color]
+
+    def resize_incidence(self):
+        """
+        Size F_in / F_out to the current places, transitions and mark kinds.
+        They are views of larger buffers whose capacity doubles when exceeded,
+        so adding nodes one by one does not copy the whole matrices each time.
+        """
+        shape = (self.M.shape[0], len(self.transition_by_col), self.M.shape[1])
+        capacity = self._F_in_buf.shape
+        if any(n > cap for n, cap in zip(shape, capacity)):
+            new_capacity = tuple(max(n, 2 * cap) if n > cap else cap for n, cap in zip(shape, capacity))
+            n_p, n_t, n_c = capacity
+            F_in_buf = np.zeros(new_capacity, dtype=np.int64)
+            F_out_buf = np.zeros(new_capacity, dtype=np.int64)
+            F_in_buf[:n_p, :n_t, :n_c] = self._F_in_buf
+            F_out_buf[:n_p, :n_t, :n_c] = self._F_out_buf
+            self._F_in_buf = F_in_buf
+            self._F_out_buf = F_out_buf
+        self.F_in = self._F_in_buf[:shape[0], :shape[1], :shape[2]]
+        self.F_out = self._F_out_buf[:shape[0], :shape[1], :shape[2]]
+
+    def marking_to_vector(self, marking):
+        """
+        Convert a marking dict to a row vector aligned with the columns of M.
+        Unknown mark kinds are added to the net.
+
+        Args:
+            marking (dict): kvp of mark kind: number
+        Returns:
+            np.ndarray: The marking vector.
+        """
+        cols = [self.add_color(color) for color in marking.keys()]
+        vec = np.zeros(len(self.color_index), dtype=np.int64)
+        vec[cols] = list(marking.values())
+        return vec
     
     def init_by_csv(self, path):
         """
@@ -82,14 +311,14 @@ class ColoredPetriNet():
             for row in reader:
                 row = {k.strip(): v.strip() for k, v in row.items()}
                 command = row['command']
-                args = ast.literal_eval(row['args'])
+                args = _parse_literal(row['args'])
                 
                 if command == 'MADP':
                     # Add Place Node
-                    self.add_node(Place(args[0], ast.literal_eval(args[1])))
+                    self.add_node(Place(args[0], _parse_literal(args[1])))
                 elif command == 'MADT':
                     # Add Transition Node
-                    self.add_node(Transition(args[0], None, ast.literal_eval(args[1])))
+                    self.add_node(Transition(args[0], None, _parse_literal(args[1])))
                 elif command == 'MADA':
                     # Add Arc
                     self.add_arc(self.name_node[args[1]], self.name_node[args[2]])
@@ -100,14 +329,12 @@ class ColoredPetriNet():
     def tokens(self):
         """
         Get the tokens of all places in the petri net.
+        Per-kind markings are the rows of M.
 
         Returns:
-            List[Dict]: The tokens of all places in the petri net.
+            np.ndarray: The number of tokens of each place, in the order the places were added.
         """
-        res = []
-        for p in self.places.values():
-            res.append({'id':p.id, 'tokens':p.tokens, 'marking':p.marking})
-        return res
+        return self.M.sum(axis=1)
         
     @property 
     def ready_transition(self):
@@ -115,20 +342,27 @@ class ColoredPetriNet():
         Return the ready transition in the petri net.
 
         Returns:
-            List[Transition]: by transition nodes.
+            List[Transition]: by transition nodes, in the order they were added.
         """
-        res = []
-        for t in self.transitions.values():
-            if self.transition_ready_check(t):
-                res.append(t)
-        return res
+        return [self.transitions[t_id] for t_id in sorted(self._ready, key=self.transition_col.get)]
         
-    def update_ready_transition(self):
+    def update_ready_transition(self, place_ids=None):
         """
         Update the ready transition in the petri net to transition nodes.
+        Only the transitions fed by the given places are re-checked.
+
+        Args:
+            place_ids (Iterable): ids of the places whose marking changed. All transitions are re-checked if None.
         """
-        for t in self.transitions.values():
-            self.transition_ready_check(t)
+        if place_ids is None:
+            for t in self.transitions.values():
+                self.transition_ready_check(t)
+            return
+        affected = set()
+        for p_id in place_ids:
+            affected |= self.place_to_transitions.get(p_id, set())
+        for t_id in affected:
+            self.transition_ready_check(self.transitions[t_id])
 
 
     def transition_ready_check(self, transition:Transition):
@@ -144,14 +378,17 @@ class ColoredPetriNet():
         for arc in transition.in_arcs.values():
             if not self.arc_ready(arc):
                 transition.status = 'unready'
+                self._ready.discard(transition.id)
                 return False
         transition.status = 'ready'
+        self._ready.add(transition.id)
         return True
     
     def arc_ready(self, arc:Arc):
         """
         Check if the input arc is ready to fire. 
-        Arc stresses the requirement of the transition.
+        Arc stresses the requirement of the transition:
+        the input place must hold at least the annotated number of every mark kind.
 
         Args:
             arc (Arc): The arc to be checked.
@@ -160,10 +397,7 @@ class ColoredPetriNet():
             Boolean: if the arc is ready to fire.
         """
         if arc.direction == 'PtoT':
-            for k in arc.annotation.keys():
-                if arc.node_in.marking[k] - arc.annotation[k] >= 0:
-                    return True
-            return False
+            return bool(np.all(self.M[arc.in_row] >= arc.ann_vec))
         else:
             return False
         
@@ -179,7 +413,7 @@ class ColoredPetriNet():
             Boolean: if the transition is successfully fired.
         """
         # print(f"firing transition: {transition.name}")
-        if transition not in self.transitions.values():
+        if transition.id not in self.transitions:
             if self.debug:
                 print(f"Transition not found in current petri net")
             return False
@@ -187,16 +421,98 @@ class ColoredPetriNet():
             if self.debug:
                 print(f"Transition not found in current petri net")
             return False
-        for arc in self.transitions[transition.id].in_arcs.values():
-            for k in arc.node_in.marking.keys():
-                arc.node_in.marking[k] -= arc.annotation[k]
-        for arc in self.transitions[transition.id].out_arcs.values():
-            for k in arc.node_out.marking.keys():
-                arc.node_out.marking[k] += arc.annotation[k]
+        col = self.transition_col[transition.id]
+        if self._single_color:
+            self.fire_transition_scalar(col)
+        else:
+            self.M -= self.F_in[:, col]
+            self.M += self.F_out[:, col]
 
-        self.update_ready_transition()
+        self.update_ready_transition(transition.ins.keys() | transition.outs.keys())
         return True
 
+    def get_scalar_arcs(self):
+        """
+        Get the arcs of each transition of a single-color net as index and weight arrays.
+
+        Returns:
+            List[Tuple[np.ndarray]]: (in rows, in weights, out rows, out weights) by transition column.
+        """
+        if self._scalar_arcs is None:
+            self._scalar_arcs = [self._scalar_arc_entry(col) for col in range(len(self.transition_by_col))]
+        return self._scalar_arcs
+
+    def _scalar_arc_entry(self, col):
+        """
+        Build the get_scalar_arcs entry of one transition from the first color of F_in / F_out.
+        """
+        F_in = self.F_in[:, col, 0]
+        F_out = self.F_out[:, col, 0]
+        in_rows = np.flatnonzero(F_in)
+        out_rows = np.flatnonzero(F_out)
+        return (in_rows, F_in[in_rows], out_rows, F_out[out_rows])
+
+    def fire_transition_scalar(self, col):
+        """
+        Move the tokens of a transition in a single-color net by indexing M_scalar.
+        No ready check is done; used by fire_transition.
+
+        Args:
+            col (int): The column of the transition.
+        """
+        in_rows, in_weights, out_rows, out_weights = self.get_scalar_arcs()[col]
+        self.M_scalar[in_rows] -= in_weights
+        self.M_scalar[out_rows] += out_weights
+
+    def concurrent_step(self):
+        """
+        Fire a maximal set of concurrently enabled transitions in one step.
+        Transitions in conflict over shared input places are taken greedily in the order they were added.
+        Used when the net is not a timed net.
+
+        Returns:
+            List[str]: The names of the fired transitions.
+
+        Example:
+            t1 and t2 compete for the token in p; t1 was added first and wins.
+            With two tokens in p both fit and fire together.
+
+            >>> net = ColoredPetriNet('conflict')
+            >>> p, t1, t2 = Place('p', {'0': 1}), Transition('t1'), Transition('t2')
+            >>> for node in (p, t1, t2): net.add_node(node)
+            >>> net.add_arc(p, t1); net.add_arc(p, t2)
+            >>> net.concurrent_step()
+            ['t1']
+            >>> p.set_mark({'0': 2})
+            >>> net.concurrent_step()
+            ['t1', 't2']
+            >>> p.tokens
+            0
+        """
+        enabled = np.all(self.M[:, None, :] >= self.F_in, axis=(0, 2)).astype(np.int64)
+        consumed = np.tensordot(self.F_in, enabled, axes=([1], [0]))
+        if np.all(consumed <= self.M):
+            step = enabled
+        else:
+            step = np.zeros(len(self.transitions), dtype=np.int64)
+            remaining = self.M.copy()
+            for col in np.flatnonzero(enabled):
+                if np.all(remaining >= self.F_in[:, col]):
+                    remaining -= self.F_in[:, col]
+                    step[col] = 1
+            consumed = self.M - remaining
+        self.M -= consumed
+        self.M += np.tensordot(self.F_out, step, axes=([1], [0]))
+
+        fired = []
+        changed_places = set()
+        for col in np.flatnonzero(step):
+            transition = self.transition_by_col[col]
+            fired.append(transition.name)
+            changed_places |= transition.ins.keys() | transition.outs.keys()
+        self.update_ready_transition(changed_places)
+        return fired
+
     def on_fire_transition(self, transition:Transition):
         """
         Set the transition to firing status.
@@ -208,7 +524,7 @@ class ColoredPetriNet():
             Boolean: if the transition is successfully started.
         """
         # print(f"on firing transition: {transition.name}")
-        if transition not in self.transitions.values():
+        if transition.id not in self.transitions:
             if self.debug:
                 print(f"Transition not found in current petri net")
             return False
@@ -216,21 +532,39 @@ class ColoredPetriNet():
             if self.debug:
                 print(f"Transition not found in current petri net")
             return False
-        if transition.work_status == 'firing':
+        col = self.transition_col[transition.id]
+        if self.firing_mask[col]:
             if self.debug:
                 print(f"Transition is already firing")
             return False
         
-        for arc in self.transitions[transition.id].in_arcs.values():
-            for k in arc.node_in.marking.keys():
-                arc.node_in.marking[k] -= arc.annotation[k]
-        transition.work_status = 'firing'
-        transition.time = transition.consumption
+        if self._single_color:
+            in_rows, in_weights, _, _ = self.get_scalar_arcs()[col]
+            self.M_scalar[in_rows] -= in_weights
+        else:
+            self.M -= self.F_in[:, col]
+        self.set_transition_firing(transition, True)
+        self.firing_times[col] = self.consumption_times[col]
+        self.update_ready_transition(transition.ins.keys())
         return True
     
+    def set_transition_firing(self, transition:Transition, firing):
+        """
+        Set the work status of the transition without moving any token.
+
+        Args:
+            transition (Transition): The transition in the net.
+            firing (bool): if the transition is firing.
+        """
+        self.firing_mask[transition.col] = firing
+        if firing:
+            self._firing.add(transition.col)
+        else:
+            self._firing.discard(transition.col)
+
     def tick(self, dt):
         """
-        Tick the time of all transitions.
+        Tick the time of the firing transitions.
 
         Args:
             dt (float): delta time
@@ -238,50 +572,62 @@ class ColoredPetriNet():
         Returns:
             List[str]: The names of the finished transitions
         """
+        if not self._firing:
+            return []
+        firing_cols = np.sort(np.fromiter(self._firing, dtype=np.int64, count=len(self._firing)))
+        if numba is not None:
+            finished_cols = _tick_kernel(self.M, self.F_out, self.firing_times, self.firing_mask, firing_cols, dt)
+        else:
+            self.firing_times[firing_cols] -= dt
+            finished_cols = firing_cols[self.firing_times[firing_cols] <= 0.0]
+            self.firing_times[finished_cols] = 0.0
+            self.firing_mask[finished_cols] = False
+            # finished transitions put their output tokens concurrently
+            self.M += self.F_out[:, finished_cols].sum(axis=1)
+        if len(finished_cols) == 0:
+            return []
+        self._firing.difference_update(finished_cols.tolist())
+
         changed = []
-        for transition in self.transitions.values():
-            f = transition.tick(dt)
-            if f:
-                changed.append(transition.name)
-                for arc in transition.out_arcs.values():
-                    for k in arc.node_out.marking.keys():
-                        arc.node_out.marking[k] += arc.annotation[k]
-                transition.work_status = 'unfiring'
-                self.update_ready_transition()
+        changed_places = set()
+        for col in finished_cols:
+            transition = self.transition_by_col[col]
+            changed.append(transition.name)
+            changed_places |= transition.outs.keys()
+        self.update_ready_transition(changed_places)
         return changed
 
     def reset_net(self):
         """
         Reset the marking of all places in the net to initial marking.
+        Then update the ready transition list.
         """
+        self.M[:] = self.M0
         for place in self.places.values():
-            place.initialize()
+            place.mark_kinds |= place.initial_marking.keys()
+        self.update_ready_transition()
         
     def get_marking_types(self):
-        for p in self.places.values():
-            for t in p.marking.keys():
-                if t not in self.marking_types:
-                    self.marking_types.append(t)
+        """
+        Get the mark kinds of the net, ordered by the columns of M.
+        The list is maintained by add_color.
+
+        Returns:
+            List[str]: The mark kinds.
+        """
         return self.marking_types
     
     def print_adj(self):
-        res = []
-        res.append(['\\'])
-        for i, key_from in enumerate(self.name_node.keys()):
-            if isinstance(self.name_node[key_from], Place) or isinstance(self.name_node[key_from], Transition):
-                res[0].append(key_from)
-                res.append([key_from])
-                for j, key_to in enumerate(self.name_node.keys()):
-                    if isinstance(self.name_node[key_to], Place) or isinstance(self.name_node[key_to], Transition):
-                        if ((self.name_node[key_from].id, self.name_node[key_to].id) in self.adj.keys()):
-                            res[i+1].append(1)
-                        else:
-                            res[i+1].append(0)
+        nodes = [n for n in self.name_node.values() if n.kind in ('P', 'T')]
+        node_idx = {n.id: i for i, n in enumerate(nodes)}
+        adj_mat = np.zeros((len(nodes), len(nodes)), dtype=np.int8)
+        for (id_from, id_to) in self.adj.keys():
+            if id_from in node_idx and id_to in node_idx:
+                adj_mat[node_idx[id_from], node_idx[id_to]] = 1
         mat_str = 'identity petri net adjMatrix: \n'
-        for i in range(len(res)):
-            for j in range(len(res[0])):
-                mat_str += str(res[i][j]) + '\t'
-            mat_str += '\n'
+        mat_str += '\\\t' + ''.join(f'{n.name}\t' for n in nodes) + '\n'
+        for n, row in zip(nodes, adj_mat):
+            mat_str += f'{n.name}\t' + ''.join(f'{v}\t' for v in row) + '\n'
         print(mat_str)
     # RL part
     def reset(self):
@@ -289,39 +635,34 @@ class ColoredPetriNet():
         Reset the net to initial state
         """
         self.reset_net()
-        self.update_ready_transition()
         
     def get_place_state(self):
         """
         Tobe overrided to customize the state of the petri net.
+        The returned array is reused by the next call; copy it to keep it.
 
         Returns:
-            np.ndarray: state matrix of places
-        """
-        marking_types = self.get_marking_types()
-        place_state = np.zeros((len(self.places), len(marking_types)))
-        for i, place in enumerate(self.places.values()):
-            for mt in marking_types:
-                if mt in place.marking.keys():
-                    place_state[i, marking_types.index(mt)] = place.marking[mt]
-        return place_state
+            np.ndarray: float state matrix of places
+        """
+        if self._place_state_buf.shape != self.M.shape:
+            self._place_state_buf = np.empty(self.M.shape)
+        np.copyto(self._place_state_buf, self.M)
+        return self._place_state_buf
     
     def get_transition_state(self):
         """
         Tobe overrided to customize the state of the petri net.
+        The returned array is reused by the next call; copy it to keep it.
 
         Returns:
-            _type_: _description_
-        """
-        trans_state = np.zeros(len(self.transitions))
-        for i, transition in enumerate(self.transitions.values()):
-            if transition.work_status == 'firing':
-                if transition.consumption == 0:
-                    trans_state[i] = 0.0
-                else:
-                    trans_state[i] = (transition.consumption - transition.time) / transition.consumption
-            else:
-                trans_state[i] = 0.0
+            np.ndarray: finished fraction of each firing transition, 0 for the others
+        """
+        if self._trans_state_buf.shape != self.firing_times.shape:
+            self._trans_state_buf = np.empty_like(self.firing_times)
+        trans_state = self._trans_state_buf
+        trans_state.fill(0.0)
+        active = self.firing_mask & (self.consumption_times != 0)
+        np.divide(self.consumption_times - self.firing_times, self.consumption_times, out=trans_state, where=active)
         return trans_state
     
     def get_state(self):